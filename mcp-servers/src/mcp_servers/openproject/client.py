@@ -11,6 +11,7 @@ import json
 import logging
 import base64
 import ssl
+from collections import OrderedDict
 from typing import Dict, Optional
 from urllib.parse import quote
 import aiohttp
@@ -33,6 +34,13 @@ class OpenProjectClient:
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.proxy = proxy
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # LRU cache for work package schemas - a schema only depends on the
+        # work package's (project, type, status), so identical combinations
+        # can skip the form round-trip entirely
+        self._schema_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._schema_cache_max_size = 128
 
         # Setup headers with Basic Auth
         self.headers = {
@@ -51,6 +59,34 @@ class OpenProjectClient:
         credentials = f"apikey:{self.api_key}"
         return base64.b64encode(credentials.encode()).decode()
 
+    async def aopen(self) -> None:
+        """
+        Open the shared HTTP session.
+
+        Called once at server startup (lifespan). Reusing one session with
+        keep-alive avoids paying the TCP+TLS handshake on every request.
+        """
+        if self._session is None or self._session.closed:
+            ssl_context = ssl.create_default_context()
+            connector = aiohttp.TCPConnector(
+                ssl=ssl_context, limit=32, keepalive_timeout=30.0
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=30)
+            )
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP session (called at server shutdown)."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, opening it lazily if needed."""
+        if self._session is None or self._session.closed:
+            await self.aopen()
+        return self._session
+
     async def _request(
         self, method: str, endpoint: str, data: Optional[Dict] = None
     ) -> Dict:
@@ -74,53 +110,47 @@ class OpenProjectClient:
         if data:
             logger.debug(f"Request body: {json.dumps(data, indent=2)}")
 
-        # Configure SSL and timeout
-        ssl_context = ssl.create_default_context()
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
-        timeout = aiohttp.ClientTimeout(total=30)
+        session = await self._get_session()
 
-        async with aiohttp.ClientSession(
-            connector=connector, timeout=timeout
-        ) as session:
-            try:
-                # Build request parameters
-                request_params = {
-                    "method": method,
-                    "url": url,
-                    "headers": self.headers,
-                    "json": data,
-                }
+        try:
+            # Build request parameters
+            request_params = {
+                "method": method,
+                "url": url,
+                "headers": self.headers,
+                "json": data,
+            }
 
-                # Add proxy if configured
-                if self.proxy:
-                    request_params["proxy"] = self.proxy
+            # Add proxy if configured
+            if self.proxy:
+                request_params["proxy"] = self.proxy
 
-                async with session.request(**request_params) as response:
-                    response_text = await response.text()
+            async with session.request(**request_params) as response:
+                response_text = await response.text()
 
-                    logger.debug(f"Response status: {response.status}")
+                logger.debug(f"Response status: {response.status}")
 
-                    # Parse response
-                    try:
-                        response_json = (
-                            json.loads(response_text) if response_text else {}
-                        )
-                    except json.JSONDecodeError:
-                        logger.error(f"Invalid JSON response: {response_text[:200]}...")
-                        response_json = {}
+                # Parse response
+                try:
+                    response_json = (
+                        json.loads(response_text) if response_text else {}
+                    )
+                except json.JSONDecodeError:
+                    logger.error(f"Invalid JSON response: {response_text[:200]}...")
+                    response_json = {}
 
-                    # Handle errors
-                    if response.status >= 400:
-                        error_msg = self._format_error_message(
-                            response.status, response_text
-                        )
-                        raise Exception(error_msg)
+                # Handle errors
+                if response.status >= 400:
+                    error_msg = self._format_error_message(
+                        response.status, response_text
+                    )
+                    raise Exception(error_msg)
 
-                    return response_json
+                return response_json
 
-            except aiohttp.ClientError as e:
-                logger.error(f"Network error: {str(e)}")
-                raise Exception(f"Network error accessing {url}: {str(e)}")
+        except aiohttp.ClientError as e:
+            logger.error(f"Network error: {str(e)}")
+            raise Exception(f"Network error accessing {url}: {str(e)}")
 
     def _format_error_message(self, status: int, response_text: str) -> str:
         """Format error message based on HTTP status code"""
@@ -906,25 +936,23 @@ class OpenProjectClient:
             "User-Agent": "OpenProject-MCP/1.0.0",
         }
         
-        ssl_context = ssl.create_default_context()
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
-        timeout = aiohttp.ClientTimeout(total=60)  # Longer timeout for uploads
-        
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            request_params = {
-                "method": "POST",
-                "url": url,
-                "headers": headers,
-                "data": form_data,
-            }
-            if self.proxy:
-                request_params["proxy"] = self.proxy
-            
-            async with session.request(**request_params) as response:
-                response_text = await response.text()
-                if response.status >= 400:
-                    raise Exception(self._format_error_message(response.status, response_text))
-                return json.loads(response_text) if response_text else {}
+        session = await self._get_session()
+
+        request_params = {
+            "method": "POST",
+            "url": url,
+            "headers": headers,
+            "data": form_data,
+            "timeout": aiohttp.ClientTimeout(total=60),  # Longer timeout for uploads
+        }
+        if self.proxy:
+            request_params["proxy"] = self.proxy
+
+        async with session.request(**request_params) as response:
+            response_text = await response.text()
+            if response.status >= 400:
+                raise Exception(self._format_error_message(response.status, response_text))
+            return json.loads(response_text) if response_text else {}
 
     async def delete_attachment(self, attachment_id: int) -> bool:
         """Delete an attachment."""
@@ -975,18 +1003,40 @@ class OpenProjectClient:
         """
         Get the schema for a work package, including allowed status transitions.
         Uses the work package form endpoint to get available values.
+
+        Schemas are cached per (project, type, status) combination, since
+        allowed values are the same for every work package sharing those.
         """
         # Get the current work package first
         current_wp = await self.get_work_package(work_package_id)
-        
+
+        links = current_wp.get("_links", {})
+        cache_key = tuple(
+            (links.get(name) or {}).get("href")
+            for name in ("project", "type", "status")
+        )
+
+        if all(cache_key):
+            cached = self._schema_cache.get(cache_key)
+            if cached is not None:
+                self._schema_cache.move_to_end(cache_key)
+                return cached
+
         # Use the form endpoint to get allowed values for updates
         # The form endpoint returns schema with allowedValues for fields
         payload = {
             "lockVersion": current_wp.get("lockVersion", 0)
         }
-        
+
         form_result = await self._request("POST", f"/work_packages/{work_package_id}/form", payload)
-        return form_result.get("_embedded", {}).get("schema", {})
+        schema = form_result.get("_embedded", {}).get("schema", {})
+
+        if all(cache_key):
+            self._schema_cache[cache_key] = schema
+            if len(self._schema_cache) > self._schema_cache_max_size:
+                self._schema_cache.popitem(last=False)
+
+        return schema
 
     async def get_work_package_available_assignees(
         self, project_id: int
@@ -7,6 +7,7 @@ Uses environment variables for configuration (OPENPROJECT_URL, OPENPROJECT_API_K
 
 import os
 import json
+import asyncio
 import logging
 import base64
 from typing import Optional, Dict, Any, AsyncIterator, Union, Annotated
@@ -49,8 +50,9 @@ async def lifespan(server: FastMCP) -> AsyncIterator[None]:
         logger.info("Please set the required environment variables")
     else:
         client = OpenProjectClient(base_url, api_key, proxy)
+        await client.aopen()
         logger.info(f"✅ OpenProject Client initialized for {base_url}")
-        
+
         # Optional: Test connection on startup
         if os.getenv("TEST_CONNECTION_ON_STARTUP", "false").lower() == "true":
             try:
@@ -60,8 +62,10 @@ async def lifespan(server: FastMCP) -> AsyncIterator[None]:
                 logger.error(f"❌ API connection test failed: {e}")
     
     yield
-    
-    # Cleanup: client doesn't need explicit cleanup (aiohttp sessions are context managers)
+
+    # Cleanup: close the shared HTTP session
+    if client:
+        await client.aclose()
     client = None
 
 
@@ -1845,6 +1849,18 @@ async def update_work_package_custom_fields(
 # Priority 10: Workflow & Status Management Tools
 # ============================================================================
 
+def _project_allowed_values(items, extra=()):
+    """Project schema allowedValues down to id/name plus any extra keys in one pass."""
+    return [
+        {
+            "id": item.get("id"),
+            "name": item.get("name", "Unknown"),
+            **{out_key: item.get(src_key, default) for out_key, src_key, default in extra},
+        }
+        for item in items
+    ]
+
+
 @mcp.tool
 async def get_work_package_schema(
     work_package_id: IntOrStr,
@@ -1868,45 +1884,22 @@ async def get_work_package_schema(
         await ctx.info(f"Getting schema for work package {work_package_id}...")
     
     result = await client.get_work_package_schema(work_package_id)
-    
-    # Extract status transition info
-    status_schema = result.get("status", {})
-    allowed_statuses = status_schema.get("_embedded", {}).get("allowedValues", [])
-    
-    # Extract type info
-    type_schema = result.get("type", {})
-    allowed_types = type_schema.get("_embedded", {}).get("allowedValues", [])
-    
-    # Extract priority info
-    priority_schema = result.get("priority", {})
-    allowed_priorities = priority_schema.get("_embedded", {}).get("allowedValues", [])
-    
+
+    # Resolve each field's allowedValues list once, then project all three
+    # through a single helper instead of three ad-hoc comprehensions
+    allowed_statuses = result.get("status", {}).get("_embedded", {}).get("allowedValues") or ()
+    allowed_types = result.get("type", {}).get("_embedded", {}).get("allowedValues") or ()
+    allowed_priorities = result.get("priority", {}).get("_embedded", {}).get("allowedValues") or ()
+
     return {
         "success": True,
         "work_package_id": work_package_id,
-        "allowed_statuses": [
-            {
-                "id": s.get("id"),
-                "name": s.get("name", "Unknown"),
-                "is_closed": s.get("isClosed", False),
-            }
-            for s in allowed_statuses
-        ],
+        "allowed_statuses": _project_allowed_values(
+            allowed_statuses, extra=(("is_closed", "isClosed", False),)
+        ),
         "allowed_status_count": len(allowed_statuses),
-        "allowed_types": [
-            {
-                "id": t.get("id"),
-                "name": t.get("name", "Unknown"),
-            }
-            for t in allowed_types
-        ],
-        "allowed_priorities": [
-            {
-                "id": p.get("id"),
-                "name": p.get("name", "Unknown"),
-            }
-            for p in allowed_priorities
-        ],
+        "allowed_types": _project_allowed_values(allowed_types),
+        "allowed_priorities": _project_allowed_values(allowed_priorities),
     }
 
 
@@ -1942,13 +1935,17 @@ async def update_work_package_status(
     data = {"status_id": status_id}
     if percentage_done is not None:
         data["percentage_done"] = percentage_done
-    
-    result = await client.update_work_package(work_package_id, data)
-    
-    # Add comment if provided
+
+    # The update and the comment hit independent endpoints, so fire them
+    # concurrently instead of paying two serialized round-trips
     if comment:
-        await client.add_work_package_comment(work_package_id, comment)
-    
+        result, _ = await asyncio.gather(
+            client.update_work_package(work_package_id, data),
+            client.add_work_package_comment(work_package_id, comment),
+        )
+    else:
+        result = await client.update_work_package(work_package_id, data)
+
     return {
         "success": True,
         "message": f"Status updated for work package {work_package_id}",
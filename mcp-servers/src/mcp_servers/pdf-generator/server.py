@@ -4,25 +4,40 @@ PDF Generator MCP Server (Multi-tenant)
 A FastMCP server providing PDF report generation with multi-tenant support.
 """
 
-import json
-import base64
 import os
+import re
+
+import orjson
+
+try:
+    # SIMD-accelerated drop-in replacement for the stdlib encoder; the
+    # base64 step dominates CPU time for large PDFs
+    import pybase64 as base64
+except ImportError:
+    import base64
 import tempfile
 import uuid
+from collections import OrderedDict
+from hashlib import blake2b
 from typing import Optional, List, Dict, Any, AsyncIterator
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import anyio
 from fastmcp import FastMCP, Context
 from pydantic import BaseModel, Field
 from starlette.responses import JSONResponse
 from starlette.requests import Request
 
 # Handle import for directory with hyphen in name
+# Resolved once at module load so tools never repeat the importlib dance
 try:
     # Try absolute import first (works when running as module with proper package structure)
-    from mcp_servers.pdf_generator.tenant_manager import PdfGeneratorTenantManager
+    from mcp_servers.pdf_generator.tenant_manager import (
+        PdfGeneratorTenantConfig,
+        PdfGeneratorTenantManager,
+    )
 except ImportError:
     # Use importlib to handle directory with hyphen
     import importlib.util
@@ -30,6 +45,7 @@ except ImportError:
     spec = importlib.util.spec_from_file_location("pdf_generator_tenant_manager", tenant_manager_path)
     tenant_manager_module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(tenant_manager_module)
+    PdfGeneratorTenantConfig = tenant_manager_module.PdfGeneratorTenantConfig
     PdfGeneratorTenantManager = tenant_manager_module.PdfGeneratorTenantManager
 
 # Initialize tenant manager
@@ -55,6 +71,14 @@ TEMP_DIR = Path(os.getenv("PDF_TEMP_DIR", "/tmp/pdf-reports"))
 TEMP_DIR.mkdir(parents=True, exist_ok=True)
 FILE_RETENTION_HOURS = int(os.getenv("PDF_RETENTION_HOURS", "24"))
 
+# Optional LRU cache of rendered PDF bytes, keyed by template/content
+# digests. Opt-in via PDF_CACHE=1: repeated renders of identical inputs
+# (e.g. per-tenant daily reports) become a dict lookup, but templates whose
+# output depends on anything besides their placeholders would come back stale.
+PDF_CACHE_ENABLED = os.getenv("PDF_CACHE", "false").lower() in ("1", "true")
+_PDF_CACHE_MAX_SIZE = 256
+_pdf_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+
 
 # ============================================================================
 # Request/Response Models
@@ -77,43 +101,76 @@ class GeneratePdfRequest(BaseModel):
 # PDF Generation Utilities
 # ============================================================================
 
-def render_template(template: str, content: Dict[str, Any]) -> str:
-    """Render HTML template with content data."""
-    html = template
-    # Simple template variable replacement: {{variable_name}}
-    for key, value in content.items():
-        placeholder = f"{{{{{key}}}}}"
-        html = html.replace(placeholder, str(value))
-    return html
+# Simple template variable syntax: {{variable_name}}
+_PLACEHOLDER_RE = re.compile(r"\{\{([^{}]+)\}\}")
+
 
+def _pdf_cache_key(template: str, content: Dict[str, Any]) -> tuple:
+    """Digest template and content so large inputs aren't held as cache keys."""
+    template_digest = blake2b(template.encode("utf-8"), digest_size=16).digest()
+    content_digest = blake2b(
+        orjson.dumps(content, option=orjson.OPT_SORT_KEYS, default=str),
+        digest_size=16,
+    ).digest()
+    return (template_digest, content_digest)
 
-def generate_pdf_from_html(html_content: str, output_path: str) -> None:
-    """Generate PDF from HTML content using weasyprint."""
+
+def render_template(template: str, content: Dict[str, Any]):
+    """Render HTML template with content data into a spooled temp file.
+
+    The rendered HTML is written chunk by chunk (template segments
+    interleaved with substituted values), so the full document is never held
+    as a single string - large reports spill to disk past 1MB instead of
+    doubling peak memory. Placeholders without a matching content key are
+    left as-is.
+    """
+    rendered = tempfile.SpooledTemporaryFile(max_size=1 << 20, mode="w+", encoding="utf-8")
+    last = 0
+    for match in _PLACEHOLDER_RE.finditer(template):
+        rendered.write(template[last:match.start()])
+        key = match.group(1)
+        rendered.write(str(content[key]) if key in content else match.group(0))
+        last = match.end()
+    rendered.write(template[last:])
+    rendered.seek(0)
+    return rendered
+
+
+def generate_pdf_from_html(html_file, output_path: str) -> None:
+    """Generate PDF from a file-like object with HTML content using weasyprint."""
     try:
         from weasyprint import HTML
-        HTML(string=html_content).write_pdf(output_path)
+        HTML(file_obj=html_file).write_pdf(output_path)
     except ImportError:
         # Fallback to reportlab if weasyprint not available
+        from html.parser import HTMLParser
         from reportlab.lib.pagesizes import letter
         from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
         from reportlab.lib.styles import getSampleStyleSheet
-        from html import unescape
-        import re
-        
+
         doc = SimpleDocTemplate(output_path, pagesize=letter)
         styles = getSampleStyleSheet()
         story = []
-        
-        # Simple HTML to reportlab conversion
-        # Remove HTML tags and extract text
-        text = re.sub(r'<[^>]+>', '', html_content)
-        text = unescape(text)
-        
-        for line in text.split('\n'):
-            if line.strip():
-                story.append(Paragraph(line.strip(), styles['Normal']))
-                story.append(Spacer(1, 12))
-        
+
+        # Simple HTML to reportlab conversion: a single-pass parser that
+        # appends text nodes directly as paragraphs (entities are unescaped
+        # by HTMLParser itself), with no intermediate full-document strings
+        class _TextExtractor(HTMLParser):
+            def handle_data(self, data):
+                for line in data.splitlines():
+                    line = line.strip()
+                    if line:
+                        story.append(Paragraph(line, styles['Normal']))
+                        story.append(Spacer(1, 12))
+
+        extractor = _TextExtractor()
+        while True:
+            chunk = html_file.read(1 << 16)
+            if not chunk:
+                break
+            extractor.feed(chunk)
+        extractor.close()
+
         doc.build(story)
 
 
@@ -149,9 +206,6 @@ async def pdf_generate_pdf(
         # Get tenant config (for future use - e.g., custom templates per tenant)
         config = tenant_manager.configs.get(tenant_id)
         
-        # Render template with content
-        html_content = render_template(template, content)
-        
         # Generate filename if not provided
         if not filename:
             filename = f"report_{tenant_id}_{uuid.uuid4().hex[:8]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
@@ -161,9 +215,31 @@ async def pdf_generate_pdf(
             filename += '.pdf'
         
         # Create temporary file
+        # PDF rendering is CPU-bound sync work (weasyprint/reportlab), so run
+        # it in a worker thread instead of blocking the event loop
         pdf_path = TEMP_DIR / filename
-        generate_pdf_from_html(html_content, str(pdf_path))
-        
+        cache_key = _pdf_cache_key(template, content) if PDF_CACHE_ENABLED else None
+        pdf_bytes = None
+        if cache_key is not None:
+            pdf_bytes = _pdf_cache.get(cache_key)
+            if pdf_bytes is not None:
+                _pdf_cache.move_to_end(cache_key)
+
+        if pdf_bytes is None:
+            with render_template(template, content) as html_file:
+                await anyio.to_thread.run_sync(generate_pdf_from_html, html_file, str(pdf_path))
+            # url responses serve straight from the file; only load the bytes
+            # when the cache or the base64 return actually needs them
+            if cache_key is not None or return_format != "url":
+                pdf_bytes = pdf_path.read_bytes()
+            if cache_key is not None:
+                _pdf_cache[cache_key] = pdf_bytes
+                if len(_pdf_cache) > _PDF_CACHE_MAX_SIZE:
+                    _pdf_cache.popitem(last=False)
+        elif return_format == "url":
+            # Cache hit - materialize the file for URL-style retrieval
+            pdf_path.write_bytes(pdf_bytes)
+
         if return_format == "url":
             # Return temporary file URL
             # In production, you might want to serve this via a web server
@@ -184,11 +260,10 @@ async def pdf_generate_pdf(
             }
         else:
             # Return base64 encoded PDF
-            with open(pdf_path, 'rb') as f:
-                pdf_data = base64.b64encode(f.read()).decode('utf-8')
-            
-            # Clean up file if returning as base64
-            pdf_path.unlink()
+            pdf_data = base64.b64encode(pdf_bytes).decode('utf-8')
+
+            # Clean up file if returning as base64 (cache hits never wrote one)
+            pdf_path.unlink(missing_ok=True)
             
             return {
                 "success": True,
@@ -248,17 +323,6 @@ async def pdf_register_tenant(
     if ctx:
         await ctx.info(f"Registering tenant: {tenant_id}")
 
-    # Handle import for directory with hyphen in name
-    try:
-        from mcp_servers.pdf_generator.tenant_manager import PdfGeneratorTenantConfig
-    except ImportError:
-        import importlib.util
-        tenant_manager_path = os.path.join(os.path.dirname(__file__), "tenant_manager.py")
-        spec = importlib.util.spec_from_file_location("pdf_generator_tenant_manager", tenant_manager_path)
-        tenant_manager_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(tenant_manager_module)
-        PdfGeneratorTenantConfig = tenant_manager_module.PdfGeneratorTenantConfig
-
     config = PdfGeneratorTenantConfig(
         tenant_id=tenant_id,
         storage_path=storage_path,
@@ -281,13 +345,13 @@ async def get_info_resource(tenant_id: str) -> str:
         "status": "active" if config else "not_registered",
         "storage_path": config.storage_path if config else None,
     }
-    return json.dumps(result, indent=2)
+    return orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
 
 
 @mcp.resource("pdf-generator://info")
 def server_info() -> str:
     """Get information about the PDF Generator MCP server."""
-    return json.dumps({
+    return orjson.dumps({
         "name": "PDF Generator MCP Server",
         "description": "Multi-tenant PDF report generation",
         "features": [
@@ -298,7 +362,7 @@ def server_info() -> str:
         ],
         "temp_directory": str(TEMP_DIR),
         "file_retention_hours": FILE_RETENTION_HOURS
-    }, indent=2)
+    }, option=orjson.OPT_INDENT_2).decode()
 
 
 # ============================================================================
@@ -5,8 +5,10 @@ Manages multiple PDF generator tenant configurations.
 Tenant configurations are persisted in Redis for durability across restarts.
 """
 
-import json
+import asyncio
 import os
+
+import orjson
 from typing import Optional, Dict
 from pathlib import Path
 
@@ -32,12 +34,21 @@ class PdfGeneratorTenantManager:
         self.redis_client: Optional[redis.Redis] = None
         self.redis_key_prefix = "mcp:pdf-generator:tenant:"
         self._redis_initialized = False
+        self._redis_init_lock = asyncio.Lock()
 
     async def _init_redis(self) -> None:
         """Initialize Redis connection if not already initialized."""
         if self._redis_initialized:
             return
 
+        async with self._redis_init_lock:
+            # Another caller may have finished while we waited for the lock
+            if self._redis_initialized:
+                return
+            await self._connect_redis()
+
+    async def _connect_redis(self) -> None:
+        """Create the Redis client and verify the connection (cold path)."""
         try:
             redis_host = os.getenv("REDIS_HOST", "redis")
             redis_port = int(os.getenv("REDIS_PORT", "6379"))
@@ -62,21 +73,23 @@ class PdfGeneratorTenantManager:
 
     async def _save_to_redis(self, config: PdfGeneratorTenantConfig) -> None:
         """Save tenant configuration to Redis."""
-        await self._init_redis()
+        if not self._redis_initialized:
+            await self._init_redis()
         if not self.redis_client:
             return
 
         try:
             key = f"{self.redis_key_prefix}{config.tenant_id}"
             # Store as JSON (sensitive data will be in plain text - consider encryption for production)
-            config_dict = config.model_dump()
-            await self.redis_client.set(key, json.dumps(config_dict))
+            # orjson emits bytes, which Redis accepts directly
+            await self.redis_client.set(key, orjson.dumps(config.model_dump()))
         except Exception as e:
             print(f"Warning: Failed to save tenant config to Redis: {e}")
 
     async def _load_from_redis(self, tenant_id: str) -> Optional[PdfGeneratorTenantConfig]:
         """Load tenant configuration from Redis."""
-        await self._init_redis()
+        if not self._redis_initialized:
+            await self._init_redis()
         if not self.redis_client:
             return None
 
@@ -84,7 +97,7 @@ class PdfGeneratorTenantManager:
             key = f"{self.redis_key_prefix}{tenant_id}"
             config_json = await self.redis_client.get(key)
             if config_json:
-                config_dict = json.loads(config_json)
+                config_dict = orjson.loads(config_json)
                 return PdfGeneratorTenantConfig(**config_dict)
         except Exception as e:
             print(f"Warning: Failed to load tenant config from Redis: {e}")
@@ -92,7 +105,8 @@ class PdfGeneratorTenantManager:
 
     async def _load_all_from_redis(self) -> Dict[str, PdfGeneratorTenantConfig]:
         """Load all tenant configurations from Redis."""
-        await self._init_redis()
+        if not self._redis_initialized:
+            await self._init_redis()
         if not self.redis_client:
             return {}
 
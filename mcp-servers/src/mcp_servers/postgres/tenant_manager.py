@@ -5,14 +5,15 @@ Manages multiple PostgreSQL tenant connections with connection pooling.
 Tenant configurations are persisted in Redis for durability across restarts.
 """
 
-import json
+import asyncio
 import os
+import time
 from typing import Optional, Dict
 from contextlib import asynccontextmanager
 
 import psycopg
 from psycopg_pool import AsyncConnectionPool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 import redis.asyncio as redis
 
 
@@ -25,9 +26,26 @@ class PostgresTenantConfig(BaseModel):
     database: str = Field(..., description="Database name")
     user: str = Field(..., description="Username")
     password: str = Field(..., description="Password")
-    min_pool_size: int = Field(default=2, description="Minimum connection pool size")
+    min_pool_size: int = Field(
+        default_factory=lambda: max(2, (os.cpu_count() or 2) // 2),
+        description="Minimum connection pool size (defaults to half the host CPUs)",
+    )
     max_pool_size: int = Field(default=10, description="Maximum connection pool size")
     ssl: bool = Field(default=False, description="Use SSL/TLS")
+    prewarm: bool = Field(
+        default=True,
+        description="Establish min_pool_size connections eagerly on registration",
+    )
+
+    @model_validator(mode="after")
+    def _clamp_pool_sizes(self) -> "PostgresTenantConfig":
+        """Clamp pool sizes so a single tenant can't exhaust the DB's connection slots."""
+        cap = int(os.getenv("DB_MAX_CONNECTIONS_PER_TENANT", "20"))
+        if self.max_pool_size > cap:
+            self.max_pool_size = cap
+        if self.min_pool_size > self.max_pool_size:
+            self.min_pool_size = self.max_pool_size
+        return self
 
     def get_connection_string(self) -> str:
         """Get PostgreSQL connection string."""
@@ -38,6 +56,55 @@ class PostgresTenantConfig(BaseModel):
         )
 
 
+class _SharedRedisClients:
+    """Process-wide Redis clients shared across tenant-manager instances.
+
+    Each (host, port, db, password) combination gets a single client, so
+    several managers in one process (multiple MCP servers, tests) don't each
+    grow their own connection pool. Managers take references; the client is
+    closed only when the last reference is released.
+    """
+
+    _clients: Dict[tuple, redis.Redis] = {}
+    _refcounts: Dict[tuple, int] = {}
+
+    @classmethod
+    async def acquire(cls, host: str, port: int, db: int, password: Optional[str]) -> redis.Redis:
+        key = (host, port, db, password)
+        client = cls._clients.get(key)
+        if client is None:
+            client = redis.Redis(
+                host=host,
+                port=port,
+                db=db,
+                password=password,
+                decode_responses=True,
+            )
+            try:
+                # Test connection
+                await client.ping()
+            except Exception:
+                await client.aclose()
+                raise
+            cls._clients[key] = client
+            cls._refcounts[key] = 0
+        cls._refcounts[key] += 1
+        return client
+
+    @classmethod
+    async def release(cls, client: redis.Redis) -> None:
+        for key, cached in cls._clients.items():
+            if cached is client:
+                cls._refcounts[key] -= 1
+                if cls._refcounts[key] <= 0:
+                    del cls._clients[key]
+                    del cls._refcounts[key]
+                    await client.aclose()
+                return
+        # Not a shared client (shouldn't happen) - close it directly
+        await client.aclose()
+
+
 class PostgresTenantManager:
     """Manages multiple PostgreSQL tenant connections with pooling and Redis persistence."""
 
@@ -46,34 +113,67 @@ class PostgresTenantManager:
         self.configs: Dict[str, PostgresTenantConfig] = {}
         self.redis_client: Optional[redis.Redis] = None
         self.redis_key_prefix = "mcp:postgres:tenant:"
-        self._redis_initialized = False
+        self._redis_ready: Optional[asyncio.Future] = None
+        self._tenant_locks: Dict[str, asyncio.Lock] = {}
 
-    async def _init_redis(self) -> None:
-        """Initialize Redis connection if not already initialized."""
-        if self._redis_initialized:
-            return
+        # Cache for catalog introspection results (list_tables/describe_table).
+        # Schemas change rarely, so repeated lookups become a dict hit; the TTL
+        # mirrors MySQL's information_schema_stats_expiry default.
+        self._schema_cache: Dict[tuple, tuple] = {}
+        self.schema_cache_ttl = float(os.getenv("POSTGRES_SCHEMA_CACHE_TTL", "86400"))
 
+    async def _init_redis(self) -> None:
+        """Initialize Redis connection if not already initialized.
+
+        The first caller starts the connection task and every caller awaits
+        the same future, so the warm path is just an await on a completed
+        future and concurrent first calls can't double-connect. The
+        check-and-assign below is synchronous, so no lock is needed on the
+        event loop.
+        """
+        if self._redis_ready is None:
+            self._redis_ready = asyncio.ensure_future(self._connect_redis())
+        await self._redis_ready
+
+    async def _connect_redis(self) -> None:
+        """Create the Redis client and verify the connection (cold path)."""
         try:
             redis_host = os.getenv("REDIS_HOST", "redis")
             redis_port = int(os.getenv("REDIS_PORT", "6379"))
             redis_db = int(os.getenv("REDIS_DB", "0"))
             redis_password = os.getenv("REDIS_PASSWORD")
 
-            self.redis_client = redis.Redis(
-                host=redis_host,
-                port=redis_port,
-                db=redis_db,
-                password=redis_password,
-                decode_responses=True,
+            self.redis_client = await _SharedRedisClients.acquire(
+                redis_host, redis_port, redis_db, redis_password
             )
-            # Test connection
-            await self.redis_client.ping()
-            self._redis_initialized = True
         except Exception as e:
             # If Redis is not available, continue without persistence
+            # (the future stays resolved, so there are no retry loops)
             print(f"Warning: Redis not available for tenant persistence: {e}")
             self.redis_client = None
-            self._redis_initialized = True  # Mark as initialized to avoid retry loops
+
+    async def cached_schema_query(self, key: tuple, query_func):
+        """Return a cached catalog-query result, re-running after the TTL."""
+        entry = self._schema_cache.get(key)
+        now = time.monotonic()
+        if entry is not None and now - entry[0] < self.schema_cache_ttl:
+            return entry[1]
+
+        result = await query_func()
+        self._schema_cache[key] = (now, result)
+        return result
+
+    def invalidate_schema_cache(self, tenant_id: Optional[str] = None) -> int:
+        """Drop cached catalog results, for one tenant or all of them."""
+        if tenant_id is None:
+            count = len(self._schema_cache)
+            self._schema_cache.clear()
+            return count
+
+        stale = [key for key in self._schema_cache if key[1] == tenant_id]
+        for key in stale:
+            del self._schema_cache[key]
+        return len(stale)
 
     async def _save_to_redis(self, config: PostgresTenantConfig) -> None:
         """Save tenant configuration to Redis."""
@@ -84,11 +184,31 @@ class PostgresTenantManager:
         try:
             key = f"{self.redis_key_prefix}{config.tenant_id}"
             # Store as JSON (password will be in plain text - consider encryption for production)
-            config_dict = config.model_dump()
-            await self.redis_client.set(key, json.dumps(config_dict))
+            # model_dump_json serializes in pydantic-core without the
+            # model_dump() dict intermediary
+            await self.redis_client.set(key, config.model_dump_json())
         except Exception as e:
             print(f"Warning: Failed to save tenant config to Redis: {e}")
 
+    async def _save_many_to_redis(self, configs) -> None:
+        """Save several tenant configurations in one pipelined round-trip."""
+        configs = list(configs)
+        if not configs:
+            return
+
+        await self._init_redis()
+        if not self.redis_client:
+            return
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for config in configs:
+                    key = f"{self.redis_key_prefix}{config.tenant_id}"
+                    pipe.set(key, config.model_dump_json())
+                await pipe.execute()
+        except Exception as e:
+            print(f"Warning: Failed to save tenant configs to Redis: {e}")
+
     async def _load_from_redis(self, tenant_id: str) -> Optional[PostgresTenantConfig]:
         """Load tenant configuration from Redis."""
         await self._init_redis()
@@ -99,8 +219,7 @@ class PostgresTenantManager:
             key = f"{self.redis_key_prefix}{tenant_id}"
             config_json = await self.redis_client.get(key)
             if config_json:
-                config_dict = json.loads(config_json)
-                return PostgresTenantConfig(**config_dict)
+                return PostgresTenantConfig.model_validate_json(config_json)
         except Exception as e:
             print(f"Warning: Failed to load tenant config from Redis: {e}")
         return None
@@ -113,13 +232,23 @@ class PostgresTenantManager:
 
         configs = {}
         try:
+            # SCAN instead of KEYS (non-blocking on large keyspaces), then one
+            # MGET so N tenants cost one fetch round-trip instead of N
             pattern = f"{self.redis_key_prefix}*"
-            keys = await self.redis_client.keys(pattern)
-            for key in keys:
+            keys = [key async for key in self.redis_client.scan_iter(match=pattern, count=500)]
+            if not keys:
+                return configs
+
+            values = await self.redis_client.mget(keys)
+            for key, config_json in zip(keys, values):
+                if not config_json:
+                    continue
                 tenant_id = key.replace(self.redis_key_prefix, "")
-                config = await self._load_from_redis(tenant_id)
-                if config:
-                    configs[tenant_id] = config
+                try:
+                    configs[tenant_id] = PostgresTenantConfig.model_validate_json(config_json)
+                except Exception as e:
+                    # One corrupt blob shouldn't kill initialization
+                    print(f"Warning: Skipping invalid tenant config '{tenant_id}': {e}")
         except Exception as e:
             print(f"Warning: Failed to load all tenant configs from Redis: {e}")
         return configs
@@ -143,9 +272,19 @@ class PostgresTenantManager:
             ssl=os.getenv(f"{prefix}_SSL", "false").lower() == "true",
         )
 
-    async def register_tenant(self, config: PostgresTenantConfig) -> None:
+    @staticmethod
+    async def _configure_connection(conn: psycopg.AsyncConnection) -> None:
+        """Per-connection setup run by the pool when a connection is created."""
+        # Prepare repeated statements from the first execution, not the fifth
+        conn.prepare_threshold = 0
+
+    async def register_tenant(self, config: PostgresTenantConfig, persist: bool = True) -> None:
         """Register a tenant and create a connection pool."""
         if config.tenant_id in self.pools:
+            # Re-registering with an identical config is a no-op; keep the
+            # warm pool instead of dropping its connections
+            if config == self.configs.get(config.tenant_id):
+                return
             # Close existing pool
             await self.pools[config.tenant_id].close()
 
@@ -155,28 +294,55 @@ class PostgresTenantManager:
             min_size=config.min_pool_size,
             max_size=config.max_pool_size,
             open=False,
+            configure=self._configure_connection,
         )
-        await pool.open()
+        try:
+            await pool.open()
+
+            # Warm min_pool_size connections up front so the first queries
+            # don't each pay the TCP+TLS+auth handshake
+            if config.prewarm:
+                async def _warm() -> None:
+                    async with pool.connection() as conn:
+                        await conn.execute("SELECT 1")
+
+                await asyncio.gather(*(_warm() for _ in range(config.min_pool_size)))
+        except Exception:
+            # Don't leak the pool (and its background tasks) when open or
+            # warm-up fails
+            await pool.close()
+            raise
+
         self.pools[config.tenant_id] = pool
         self.configs[config.tenant_id] = config
 
-        # Persist to Redis
-        await self._save_to_redis(config)
+        # Persist to Redis (skipped for configs that were just loaded from it)
+        if persist:
+            await self._save_to_redis(config)
 
     async def get_pool(self, tenant_id: str) -> AsyncConnectionPool:
         """Get connection pool for a tenant."""
-        if tenant_id not in self.pools:
-            # Try to load from Redis first
-            config = await self._load_from_redis(tenant_id)
-            if not config:
-                # Fall back to environment variables
-                config = self.load_tenant_from_env(tenant_id)
-            if config:
-                await self.register_tenant(config)
-            else:
-                raise ValueError(
-                    f"Tenant '{tenant_id}' not found. Configure it via environment variables or register it programmatically."
-                )
+        if tenant_id in self.pools:
+            return self.pools[tenant_id]
+
+        # Serialize first access per tenant: without this, concurrent cold
+        # calls each observe the missing pool and register it twice, with the
+        # second open clobbering (and leaking connections from) the first.
+        # setdefault is atomic on the event loop, so no extra guard is needed.
+        lock = self._tenant_locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            if tenant_id not in self.pools:
+                # Try to load from Redis first
+                config = await self._load_from_redis(tenant_id)
+                if not config:
+                    # Fall back to environment variables
+                    config = self.load_tenant_from_env(tenant_id)
+                if config:
+                    await self.register_tenant(config)
+                else:
+                    raise ValueError(
+                        f"Tenant '{tenant_id}' not found. Configure it via environment variables or register it programmatically."
+                    )
 
         return self.pools[tenant_id]
 
@@ -187,12 +353,36 @@ class PostgresTenantManager:
         async with pool.connection() as conn:
             yield conn
 
+    async def _register_many(self, configs) -> None:
+        """Register several tenants concurrently, logging (not raising) failures.
+
+        Pool opening is dominated by per-tenant TCP/TLS handshakes, so run
+        registrations in parallel; the semaphore keeps a large tenant count
+        from stampeding the database.
+        """
+        configs = list(configs)
+        if not configs:
+            return
+
+        semaphore = asyncio.Semaphore(16)
+
+        async def _register(config: PostgresTenantConfig) -> None:
+            async with semaphore:
+                await self.register_tenant(config, persist=False)
+
+        results = await asyncio.gather(
+            *(_register(config) for config in configs), return_exceptions=True
+        )
+        for config, result in zip(configs, results):
+            if isinstance(result, BaseException):
+                print(f"Warning: Failed to register tenant '{config.tenant_id}': {result}")
+
     async def initialize(self) -> None:
         """Initialize tenant manager - load all tenants from Redis and environment."""
-        # Load all from Redis
+        # Load all from Redis; these are already persisted, so don't write
+        # them back one SET at a time
         redis_configs = await self._load_all_from_redis()
-        for config in redis_configs.values():
-            await self.register_tenant(config)
+        await self._register_many(redis_configs.values())
 
         # Also load from environment variables (they take precedence)
         # Check for common tenant IDs
@@ -202,11 +392,21 @@ class PostgresTenantManager:
                 tenant_id = key.replace("POSTGRES_TENANT_", "").replace("_HOST", "").lower()
                 tenant_ids.add(tenant_id)
 
+        # Env takes precedence, but when Redis already delivered an identical
+        # config (the common case) there's nothing to do - re-registering
+        # would tear down and re-open a freshly warmed pool
+        env_configs = []
         for tenant_id in tenant_ids:
-            if tenant_id not in self.configs:
-                config = self.load_tenant_from_env(tenant_id)
-                if config:
-                    await self.register_tenant(config)
+            config = self.load_tenant_from_env(tenant_id)
+            if config and config != self.configs.get(tenant_id):
+                env_configs.append(config)
+
+        await self._register_many(env_configs)
+
+        # Persist all env-sourced tenants in a single pipelined batch
+        await self._save_many_to_redis(
+            config for config in env_configs if config.tenant_id in self.pools
+        )
 
     async def close_all(self) -> None:
         """Close all connection pools and Redis connection."""
@@ -216,6 +416,6 @@ class PostgresTenantManager:
         self.configs.clear()
 
         if self.redis_client:
-            await self.redis_client.aclose()
+            await _SharedRedisClients.release(self.redis_client)
             self.redis_client = None
-            self._redis_initialized = False
+        self._redis_ready = None
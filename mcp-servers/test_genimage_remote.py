@@ -6,17 +6,289 @@ This script tests the MCP server via HTTP endpoint to ensure it works
 for remote clients like Cursor.
 """
 
+import asyncio
 import json
+import os
+import re
 import requests
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 BASE_URL = "https://mcp.baisoln.com/genimage/mcp"
 
+try:
+    # orjson serializes straight to bytes and parses several times faster
+    # than stdlib json - it matters most for the image_data-bearing frames
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+
+    def _frame_loads(buf: bytearray, start: int, end: int):
+        # orjson parses straight from a memoryview - no slice copy at all
+        return orjson.loads(memoryview(buf)[start:end])
+except ImportError:
+    # One shared decoder: calling .decode directly skips json.loads' per-call
+    # argument dispatch on the frame-parsing hot path
+    _JSON_DECODER = json.JSONDecoder()
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    def _json_loads(data):
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode()
+        return _JSON_DECODER.decode(data)
+
+    def _frame_loads(buf: bytearray, start: int, end: int):
+        return _JSON_DECODER.decode(bytes(buf[start:end]).decode())
+
+# Request payloads are constant, so serialize each exactly once and POST the
+# raw bytes (the JSON content type is already set on the session headers)
+INIT_PAYLOAD = {
+    "jsonrpc": "2.0",
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {
+            "name": "test-remote-client",
+            "version": "1.0.0"
+        }
+    },
+    "id": 1
+}
+
+LIST_TOOLS_PAYLOAD = {
+    "jsonrpc": "2.0",
+    "method": "tools/list",
+    "params": {},
+    "id": 2
+}
+
+GENERATE_PAYLOAD = {
+    "jsonrpc": "2.0",
+    "method": "tools/call",
+    "params": {
+        "name": "gi_generate_image",
+        "arguments": {
+            "tenant_id": "fedfina",
+            "prompt": "pigs flying using picasso style",
+            "width": 1024,
+            "height": 1024,
+            "steps": 40,
+            "cfg_scale": 5.0
+        }
+    },
+    "id": 3
+}
+
+INIT_BODY = _json_dumps(INIT_PAYLOAD)
+BATCH_BODY = _json_dumps([LIST_TOOLS_PAYLOAD, GENERATE_PAYLOAD])
+SINGLE_BODIES = {
+    LIST_TOOLS_PAYLOAD["id"]: _json_dumps(LIST_TOOLS_PAYLOAD),
+    GENERATE_PAYLOAD["id"]: _json_dumps(GENERATE_PAYLOAD),
+}
+
+# Upper bound on buffered, not-yet-terminated SSE data so a misbehaving
+# server can't grow the parser buffer without limit
+MAX_SSE_BUFFER_SIZE = 10 * 1024 * 1024
+
+# Abort guards for runaway notification loops: a server streaming endlessly
+# would otherwise keep the test pinned until the request timeout
+MAX_SSE_FRAMES = 2000
+MAX_SSE_STREAM_BYTES = 32 * 1024 * 1024
+
+# Per-frame diagnostics are opt-in: formatting and printing every progress
+# notification dominates wallclock on chatty streams
+DEBUG_SSE = os.environ.get('MCP_DEBUG_SSE') == '1'
+
+# tools/list is purely informational for this test - only the generate call
+# matters - so the extra enumeration round-trip is opt-in too
+VERIFY_TOOLS = os.environ.get('MCP_VERIFY_TOOLS') == '1' 
+
+
+class SseStreamParser:
+    """Incremental SSE parser: feed byte chunks, get parsed JSON messages.
+
+    Maintains one byte buffer across feeds and scans each complete line
+    exactly once; only `data:` payloads are decoded and JSON-parsed, so no
+    full-body string or line list is ever materialized.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._total_bytes = 0
+
+    def feed(self, chunk: bytes):
+        """Consume a chunk, yielding a dict per complete data: frame."""
+        self._buf += chunk
+        self._total_bytes += len(chunk)
+        if self._total_bytes > MAX_SSE_STREAM_BYTES:
+            raise ValueError(
+                f"SSE stream exceeded {MAX_SSE_STREAM_BYTES} bytes"
+            )
+        if len(self._buf) > MAX_SSE_BUFFER_SIZE:
+            raise ValueError(
+                f"SSE line exceeded {MAX_SSE_BUFFER_SIZE} bytes without a terminator"
+            )
+        while True:
+            buf = self._buf
+            newline = buf.find(b'\n')
+            if newline == -1:
+                break
+            end = newline
+            if end > 0 and buf[end - 1] == 0x0D:  # trailing \r
+                end -= 1
+            # Plain byte-slice compares: event:/id:/comment/blank lines are
+            # skipped without ever being decoded to str. data: payloads are
+            # parsed in place from buffer offsets (a memoryview under
+            # orjson), so no slice-then-strip allocations happen per frame
+            msg = None
+            if buf[:5] == b'data:':
+                start = 5
+                while start < end and buf[start] in (0x20, 0x09):
+                    start += 1
+                while end > start and buf[end - 1] in (0x20, 0x09):
+                    end -= 1
+                try:
+                    msg = _frame_loads(buf, start, end)
+                except ValueError:
+                    msg = None
+            # Trim before yielding so an abandoned generator leaves the
+            # buffer consistent
+            del self._buf[:newline + 1]
+            if msg is not None:
+                yield msg
+
+
+def iter_sse(response: requests.Response):
+    """Yield parsed JSON messages from a streamed SSE response's data: frames."""
+    parser = SseStreamParser()
+    for chunk in response.iter_content(chunk_size=4096):
+        yield from parser.feed(chunk)
+
+
+def probe_image_result(text: str):
+    """Cheaply probe a successful generate result without decoding the base64.
+
+    The multi-MB image_data string is only ever measured and previewed, so
+    locate its bounds in the raw text instead of json.loads-ing (and
+    unescaping) the whole payload - base64 contains no quotes or escapes, so
+    substring bounds are exact. Returns (format, width, height, data_len,
+    preview) or None when the text doesn't look like a success payload.
+    """
+    if not re.search(r'"success"\s*:\s*true', text):
+        return None
+    data_match = re.search(r'"image_data"\s*:\s*"', text)
+    if not data_match:
+        return None
+    start = data_match.end()
+    end = text.find('"', start)
+    if end <= start:
+        return None
+
+    fmt = re.search(r'"format"\s*:\s*"([^"]*)"', text)
+    width = re.search(r'"width"\s*:\s*(\d+)', text)
+    height = re.search(r'"height"\s*:\s*(\d+)', text)
+    return (
+        fmt.group(1) if fmt else 'unknown',
+        width.group(1) if width else None,
+        height.group(1) if height else None,
+        end - start,
+        text[start:min(end, start + 80)],
+    )
+
+
+def tail_scan_for_result(text: str, target_id):
+    """Scan a buffered SSE body backwards for the terminal result frame.
+
+    The result is virtually always the last data: frame after a long tail of
+    progress notifications, so walking rfind from the end parses one or two
+    frames instead of every notification. Returns the message or None.
+    """
+    idx = text.rfind('data:')
+    while idx != -1:
+        line_end = text.find('\n', idx)
+        frame = text[idx + 5:line_end if line_end != -1 else len(text)].strip()
+        try:
+            msg = _json_loads(frame)
+            if msg.get('id') == target_id and ('result' in msg or 'error' in msg):
+                return msg
+        except ValueError:
+            pass
+        idx = text.rfind('data:', 0, idx)
+    return None
+
+
+def collect_messages(response: requests.Response, target_ids):
+    """Collect JSON-RPC messages from a response, keyed by request id.
+
+    Streams SSE frames when the server sends an event stream, stopping as
+    soon as every awaited id has answered; falls back to plain JSON bodies
+    (single object or batch array). Returns (messages_by_id, last_msg,
+    message_count).
+    """
+    by_id = {}
+    last_msg = None
+    count = 0
+    remaining = set(target_ids)
+
+    if 'text/event-stream' in response.headers.get('content-type', ''):
+        try:
+            for msg in iter_sse(response):
+                last_msg = msg
+                count += 1
+                if DEBUG_SSE:
+                    print(f"   [sse] frame {count}: {msg.get('method') or msg.get('id')}")
+                if count > MAX_SSE_FRAMES:
+                    print(f"   ❌ Aborting: {count} SSE frames without a result (loop?)")
+                    break
+                msg_id = msg.get('id')
+                if msg_id in remaining and ('result' in msg or 'error' in msg):
+                    by_id[msg_id] = msg
+                    remaining.discard(msg_id)
+                    if not remaining:
+                        break
+        except ValueError as e:
+            print(f"   ❌ Aborting SSE stream: {e}")
+        response.close()
+    else:
+        try:
+            body = response.json()
+        except ValueError:
+            # Some gateways return SSE-formatted bodies without the
+            # event-stream content type; tail-scan those instead of parsing
+            # every notification frame front to back
+            for target_id in target_ids:
+                msg = tail_scan_for_result(response.text, target_id)
+                if msg is not None:
+                    by_id[target_id] = msg
+                    last_msg = msg
+                    count += 1
+            return by_id, last_msg, count
+        for msg in body if isinstance(body, list) else [body]:
+            last_msg = msg
+            count += 1
+            if msg.get('id') in remaining:
+                by_id[msg['id']] = msg
+
+    return by_id, last_msg, count
+
 
 def extract_session_id(response: requests.Response) -> Optional[str]:
-    """Extract session ID from response headers or cookies."""
+    """Extract session ID from response headers or cookies.
+
+    The SSE body itself is handled by the caller via iter_sse (the streamed
+    body can only be consumed once).
+    """
     # Check headers
     session_id = response.headers.get("X-Session-Id") or response.headers.get("Mcp-Session-Id")
     if session_id:
@@ -27,82 +299,80 @@ def extract_session_id(response: requests.Response) -> Optional[str]:
         if 'session' in cookie.name.lower():
             return cookie.value
     
-    # Try to extract from SSE response
-    if 'text/event-stream' in response.headers.get('content-type', ''):
-        for line in response.text.split('\n'):
-            if line.startswith('data:'):
-                try:
-                    data = json.loads(line[5:].strip())
-                    if 'result' in data:
-                        # Session ID might be in result metadata
-                        result = data['result']
-                        if isinstance(result, dict):
-                            session_id = result.get('sessionId') or result.get('session_id')
-                            if session_id:
-                                return session_id
-                except:
-                    pass
-    
     return None
 
 
-def test_remote_mcp():
-    """Test MCP server via HTTP endpoint."""
+# Cached (session, session_id, last_used) so repeated test_remote_mcp()
+# calls in a long-lived process reuse one TCP+TLS connection and skip the
+# initialize handshake entirely; idle sessions are discarded after a while
+# since the server may have expired them
+_CACHED_SESSION = None
+_SESSION_IDLE_TIMEOUT = 300.0
+
+
+def initialize_session():
+    """Build a session and run the MCP initialize handshake (step 1).
+
+    Returns (session, session_id); session is None when the handshake failed.
+    """
     session = requests.Session()
     
-    print("=" * 70)
-    print("Testing GenImage MCP Server for Remote Clients")
-    print("=" * 70)
-    print(f"Endpoint: {BASE_URL}\n")
+    # Keep-alive pool sized above the default (so sequential POSTs reuse one
+    # TLS connection even under reuse in load scripts), retries for transient
+    # gateway errors, and the common headers set once instead of per request
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=['POST'],
+        ),
+    )
+    session.mount('https://', adapter)
+    session.headers.update({
+        'Connection': 'keep-alive',
+        'Content-Type': 'application/json',
+        'Accept': 'application/json, text/event-stream',
+    })
     
-    # Step 1: Initialize
     print("Step 1: Initializing MCP session...")
-    init_payload = {
-        "jsonrpc": "2.0",
-        "method": "initialize",
-        "params": {
-            "protocolVersion": "2024-11-05",
-            "capabilities": {},
-            "clientInfo": {
-                "name": "test-remote-client",
-                "version": "1.0.0"
-            }
-        },
-        "id": 1
-    }
     
     try:
         init_response = session.post(
             BASE_URL,
-            headers={
-                "Content-Type": "application/json",
-                "Accept": "application/json, text/event-stream"
-            },
-            json=init_payload,
-            timeout=30
+            data=INIT_BODY,
+            timeout=30,
+            stream=True
         )
         
         print(f"   Status: {init_response.status_code}")
         
         if init_response.status_code != 200:
             print(f"   ❌ Initialize failed: {init_response.text[:200]}")
-            return False
+            session.close()
+            return None, None
         
-        # Parse initialize response first to get session ID from result
+        # Parse initialize response first to get session ID from result,
+        # streaming so the body is never buffered whole
         init_data = None
         session_id = None
-        for line in init_response.text.split('\n'):
-            if line.startswith('data:'):
-                try:
-                    init_data = json.loads(line[5:].strip())
-                    if 'result' in init_data:
-                        # Session ID might be in result metadata
-                        result = init_data['result']
-                        if isinstance(result, dict):
-                            session_id = result.get('sessionId') or result.get('session_id')
-                    break
-                except:
-                    pass
+        if 'text/event-stream' in init_response.headers.get('content-type', ''):
+            for msg in iter_sse(init_response):
+                init_data = msg
+                if 'result' in msg:
+                    # Session ID might be in result metadata
+                    result = msg['result']
+                    if isinstance(result, dict):
+                        session_id = result.get('sessionId') or result.get('session_id')
+                break
+            init_response.close()
+        else:
+            try:
+                init_data = init_response.json()
+            except ValueError:
+                pass
         
         # Also try to extract from headers/cookies
         if not session_id:
@@ -127,150 +397,151 @@ def test_remote_mcp():
         
     except Exception as e:
         print(f"   ❌ Initialize error: {e}")
-        return False
+        session.close()
+        return None, None
     
-    # Step 2: List tools
-    print("\nStep 2: Listing available tools...")
-    list_tools_payload = {
-        "jsonrpc": "2.0",
-        "method": "tools/list",
-        "params": {},
-        "id": 2
-    }
+    return session, session_id
+
+
+def test_remote_mcp():
+    """Test MCP server via HTTP endpoint."""
+    global _CACHED_SESSION
     
-    try:
-        tools_response = session.post(
-            BASE_URL,
-            headers={
-                "Content-Type": "application/json",
-                "Accept": "application/json, text/event-stream"
-            },
-            json=list_tools_payload,
-            timeout=30
-        )
-        
-        if tools_response.status_code == 200:
-            tools_data = None
-            for line in tools_response.text.split('\n'):
-                if line.startswith('data:'):
-                    try:
-                        tools_data = json.loads(line[5:].strip())
-                        break
-                    except:
-                        pass
-            
-            if tools_data and 'result' in tools_data:
-                tools = tools_data['result'].get('tools', [])
-                tool_names = [t.get('name', '') for t in tools]
-                print(f"   ✅ Found {len(tools)} tools:")
-                for name in tool_names[:5]:
-                    print(f"      - {name}")
-                if len(tools) > 5:
-                    print(f"      ... and {len(tools) - 5} more")
-            else:
-                print("   ⚠️  Could not parse tools list")
+    print("=" * 70)
+    print("Testing GenImage MCP Server for Remote Clients")
+    print("=" * 70)
+    print(f"Endpoint: {BASE_URL}\n")
+    
+    # Step 1: Initialize (or reuse a cached, recently used session)
+    session = None
+    if _CACHED_SESSION is not None:
+        cached_session, cached_id, last_used = _CACHED_SESSION
+        if time.time() - last_used < _SESSION_IDLE_TIMEOUT:
+            print("Step 1: Reusing cached MCP session...")
+            session, session_id = cached_session, cached_id
         else:
-            print(f"   ⚠️  Tools list returned {tools_response.status_code}")
-    except Exception as e:
-        print(f"   ⚠️  Tools list error: {e}")
+            cached_session.close()
+            _CACHED_SESSION = None
+    
+    if session is None:
+        session, session_id = initialize_session()
+        if session is None:
+            return False
+    
+    _CACHED_SESSION = (session, session_id, time.time())
+    
+    # Steps 2+3: batch tools/list (when requested) and the generate call
+    # into a single JSON-RPC batch POST - one HTTPS round-trip. Falls back
+    # to individual requests if the server rejects batch bodies.
+    if VERIFY_TOOLS:
+        print("\nStep 2: Listing available tools...")
+        request_body = BATCH_BODY
+        target_ids = (2, 3)
+    else:
+        print("\nStep 2: Skipping tools/list (set MCP_VERIFY_TOOLS=1 to enable)...")
+        request_body = SINGLE_BODIES[GENERATE_PAYLOAD["id"]]
+        target_ids = (3,)
     
-    # Step 3: Generate image
     print("\nStep 3: Generating image 'pigs flying using picasso style'...")
     print("   Tenant: fedfina")
     print("   Prompt: pigs flying using picasso style")
     print("   Size: 1024x1024")
     print("   This may take 30-60 seconds...")
     
-    generate_payload = {
-        "jsonrpc": "2.0",
-        "method": "tools/call",
-        "params": {
-            "name": "gi_generate_image",
-            "arguments": {
-                "tenant_id": "fedfina",
-                "prompt": "pigs flying using picasso style",
-                "width": 1024,
-                "height": 1024,
-                "steps": 40,
-                "cfg_scale": 5.0
-            }
-        },
-        "id": 3
-    }
-    
     try:
         start_time = time.time()
-        generate_response = session.post(
+        batch_response = session.post(
             BASE_URL,
-            headers={
-                "Content-Type": "application/json",
-                "Accept": "application/json, text/event-stream"
-            },
-            json=generate_payload,
-            timeout=120  # 2 minutes for image generation
+            data=request_body,
+            timeout=120,  # 2 minutes for image generation
+            stream=True
         )
         
+        if batch_response.status_code == 200:
+            messages, last_msg, message_count = collect_messages(batch_response, target_ids)
+        else:
+            # Server doesn't accept JSON-RPC batches - issue the calls
+            # individually, overlapped in a small thread pool so the quick
+            # tools/list doesn't serialize in front of the 30-120s generate
+            print(f"   ⚠️  Batch request returned {batch_response.status_code}, falling back to parallel calls...")
+            batch_response.close()
+            messages = {}
+            last_msg = None
+            message_count = 0
+            
+            def _post_and_collect(request_id, body):
+                response = session.post(
+                    BASE_URL,
+                    data=body,
+                    timeout=120,
+                    stream=True
+                )
+                if response.status_code != 200:
+                    raise RuntimeError(f"Request failed: {response.text[:500]}")
+                return collect_messages(response, (request_id,))
+            
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [
+                    executor.submit(_post_and_collect, request_id, SINGLE_BODIES[request_id])
+                    for request_id in target_ids
+                ]
+                try:
+                    for future in futures:
+                        collected, last_msg, message_count = future.result()
+                        messages.update(collected)
+                except RuntimeError as e:
+                    print(f"   ❌ {e}")
+                    return False
+        
         elapsed = time.time() - start_time
         print(f"   Response received in {elapsed:.1f} seconds")
-        print(f"   Status: {generate_response.status_code}")
         
-        if generate_response.status_code != 200:
-            print(f"   ❌ Request failed: {generate_response.text[:500]}")
-            return False
-        
-        # Parse streaming response - look for the actual result, not just notifications
-        result_data = None
-        all_messages = []
-        
-        for line in generate_response.text.split('\n'):
-            if line.startswith('data:'):
-                try:
-                    msg = json.loads(line[5:].strip())
-                    all_messages.append(msg)
-                    # Look for the actual result (has 'id' field matching our request)
-                    if 'id' in msg and msg.get('id') == 3:
-                        if 'result' in msg:
-                            result_data = msg
-                            break
-                except:
-                    pass
+        if VERIFY_TOOLS:
+            tools_data = messages.get(2)
+            if tools_data and 'result' in tools_data:
+                tools = tools_data['result'].get('tools', [])
+                tool_names = [t.get('name', '') for t in tools]
+                print(f"   ✅ Found {len(tools)} tools:")
+                for name in tool_names[:5]:
+                    print(f"      - {name}")
+                if len(tools) > 5:
+                    print(f"      ... and {len(tools) - 5} more")
+            else:
+                print("   ⚠️  Could not parse tools list")
         
+        result_data = messages.get(3)
         if not result_data:
-            # Try regular JSON (non-streaming response)
-            try:
-                result_data = generate_response.json()
-                if 'id' in result_data and result_data.get('id') == 3:
-                    pass  # This is our result
+            if last_msg is not None:
+                print(f"   ⚠️  Received {message_count} messages, waiting for result...")
+                if 'result' in last_msg:
+                    result_data = last_msg
                 else:
-                    # Might be a notification, look through all messages
-                    for msg in all_messages:
-                        if 'id' in msg and msg.get('id') == 3 and 'result' in msg:
-                            result_data = msg
-                            break
-            except:
-                # If no JSON result found, check if we got notifications
-                if all_messages:
-                    print(f"   ⚠️  Received {len(all_messages)} messages, waiting for result...")
-                    # The result might come in a separate response or we need to poll
-                    # For now, check the last message
-                    if all_messages:
-                        last_msg = all_messages[-1]
-                        if 'result' in last_msg:
-                            result_data = last_msg
-                        else:
-                            print(f"   ⚠️  Last message was: {last_msg.get('method', 'unknown')}")
-                            print(f"   Full response text: {generate_response.text[:1000]}")
-                else:
-                    print(f"   ❌ Could not parse response: {generate_response.text[:500]}")
-                    return False
+                    print(f"   ⚠️  Last message was: {last_msg.get('method', 'unknown')}")
+            else:
+                print("   ❌ Could not parse response")
+                return False
         
         print("\n" + "=" * 70)
         if 'result' in result_data:
             content = result_data['result'].get('content', [])
             if content:
                 text = content[0].get('text', '')
+                
+                # Fast path: success with image data never needs a full parse
+                probe = probe_image_result(text)
+                if probe is not None:
+                    image_format, width, height, data_len, preview = probe
+                    print("✅ IMAGE GENERATION SUCCESSFUL!")
+                    print("=" * 70)
+                    print(f"Format: {image_format}")
+                    print(f"Dimensions: {width}x{height}")
+                    print(f"Image data: {data_len} characters (base64 encoded)")
+                    print(f"Preview: {preview}...")
+                    print("\n✅ Image is ready! Base64 data available.")
+                    return True
+                
                 try:
-                    result_json = json.loads(text)
+                    result_json = _json_loads(text)
                     if result_json.get('success'):
                         print("✅ IMAGE GENERATION SUCCESSFUL!")
                         print("=" * 70)
@@ -290,7 +561,7 @@ def test_remote_mcp():
                         print("=" * 70)
                         print(f"Error: {result_json.get('error', 'Unknown error')}")
                         return False
-                except json.JSONDecodeError:
+                except ValueError:
                     print("Response text:")
                     print(text[:500])
                     if 'success' in text.lower():
@@ -324,6 +595,18 @@ def test_remote_mcp():
         return False
 
 
+async def test_remote_mcp_async():
+    """Run the remote test without blocking the caller's event loop.
+
+    Used when this check is embedded in a larger async harness: the whole
+    blocking requests flow (including the up-to-120s generate wait) runs in
+    a worker thread and can be awaited concurrently with other tasks. The
+    transport itself stays on requests, whose mounted adapter, retry policy
+    and cached-session reuse the rest of this module is built around.
+    """
+    return await asyncio.to_thread(test_remote_mcp)
+
+
 if __name__ == "__main__":
     success = test_remote_mcp()
     print("\n" + "=" * 70)
@@ -7,20 +7,51 @@ import asyncio
 import httpx
 import json
 
+MCP_CLIENT_MAX_CONNECTIONS = 500
+MCP_CLIENT_MAX_KEEPALIVE_CONNECTIONS = 100
+
+
+def make_mcp_client() -> httpx.AsyncClient:
+    """Build an MCP HTTP client with explicit pool limits and keep-alive.
+
+    The default httpx limits are fine for one-off scripts but inadequate once
+    this pattern is reused for load generation; HTTP/2 multiplexing is used
+    when the optional h2 package is installed.
+    """
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    # Static headers live on the client so each request doesn't rebuild them
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(30.0, connect=5.0),
+        limits=httpx.Limits(
+            max_connections=MCP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=MCP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=30.0,
+        ),
+        headers={
+            "Content-Type": "application/json",
+            "Accept": "application/json, text/event-stream",
+        },
+    )
+
 
 async def test_mcp_registration():
     """Test registering Fedfina tenant via MCP HTTP endpoint."""
     base_url = "http://localhost:8001/mcp"
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        # Step 1: Initialize session
+    async with make_mcp_client() as client:
+        # Step 1: Initialize session, streaming the SSE body and stopping at
+        # the first result frame instead of buffering and re-splitting it
         print("Step 1: Initializing MCP session...")
-        init_response = await client.post(
+        session_id = None
+        async with client.stream(
+            'POST',
             base_url,
-            headers={
-                "Content-Type": "application/json",
-                "Accept": "application/json, text/event-stream"
-            },
             json={
                 "jsonrpc": "2.0",
                 "method": "initialize",
@@ -34,36 +65,32 @@ async def test_mcp_registration():
                 },
                 "id": 1
             }
-        )
-        
-        if init_response.status_code != 200:
-            print(f"❌ Initialize failed: {init_response.status_code}")
-            print(init_response.text)
-            return False
-        
-        # Parse session ID from response
-        session_id = None
-        for line in init_response.text.split('\n'):
-            if line.startswith('data:'):
-                data = json.loads(line[5:].strip())
-                if 'result' in data:
-                    # Extract session ID from headers or response
-                    session_id = init_response.headers.get('X-Session-Id') or data.get('result', {}).get('sessionId')
-                    break
+        ) as init_response:
+            if init_response.status_code != 200:
+                body = await init_response.aread()
+                print(f"❌ Initialize failed: {init_response.status_code}")
+                print(body.decode(errors='replace'))
+                return False
+            
+            # Parse session ID from response
+            async for line in init_response.aiter_lines():
+                if line.startswith('data:'):
+                    data = json.loads(line[5:].strip())
+                    if 'result' in data:
+                        # Extract session ID from headers or response
+                        session_id = init_response.headers.get('X-Session-Id') or data.get('result', {}).get('sessionId')
+                        break
         
         print(f"✅ Session initialized")
         if session_id:
             print(f"   Session ID: {session_id}")
+            # Attach the session id once; subsequent requests inherit it
+            client.headers['X-Session-Id'] = session_id
         
         # Step 2: Register tenant
         print("\nStep 2: Registering Fedfina tenant...")
         register_response = await client.post(
             base_url,
-            headers={
-                "Content-Type": "application/json",
-                "Accept": "application/json, text/event-stream",
-                "X-Session-Id": session_id if session_id else ""
-            },
             json={
                 "jsonrpc": "2.0",
                 "method": "tools/call",
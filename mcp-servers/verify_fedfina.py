@@ -9,15 +9,37 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from mcp_servers.postgres.tenant_manager import PostgresTenantManager
 
+# Shared manager so repeated verify() calls from a long-lived process (e.g.
+# a supervising health-check loop with VERIFY_KEEP_POOL=1) reuse the warm
+# Postgres pools and Redis client instead of re-handshaking every run
+_manager = None
+
+
+def get_manager() -> PostgresTenantManager:
+    global _manager
+    if _manager is None:
+        _manager = PostgresTenantManager()
+    return _manager
+
+
+async def close_manager() -> None:
+    global _manager
+    if _manager is not None:
+        await _manager.close_all()
+        _manager = None
+
 
 async def verify():
     """Verify Fedfina tenant and test query."""
-    manager = PostgresTenantManager()
+    manager = get_manager()
     
     try:
-        # Initialize to load from Redis
-        await manager._init_redis()
-        redis_configs = await manager._load_all_from_redis()
+        # The Redis listing and the Fedfina pool warm-up are independent, so
+        # overlap the Redis round-trip with connection establishment
+        redis_configs, _ = await asyncio.gather(
+            manager._load_all_from_redis(),
+            manager.get_pool("fedfina"),
+        )
         print(f"✅ Found {len(redis_configs)} tenant(s) in Redis:")
         for tenant_id in redis_configs.keys():
             print(f"   - {tenant_id}")
@@ -33,16 +55,21 @@ async def verify():
                     ORDER BY table_name
                     LIMIT 10
                 """)
-                tables = await cur.fetchall()
-                print(f"✅ Found {len(tables)} tables:")
-                for table in tables:
-                    print(f"   - {table[0]}")
+                # Stream rows off the cursor instead of materializing the
+                # whole result set with fetchall
+                table_count = 0
+                async for (table_name,) in cur:
+                    print(f"   - {table_name}")
+                    table_count += 1
+                print(f"✅ Found {table_count} tables")
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
         traceback.print_exc()
     finally:
-        await manager.close_all()
+        # Keep pools warm for the next invocation when asked to
+        if os.getenv('VERIFY_KEEP_POOL') != '1':
+            await close_manager()
 
 
 if __name__ == "__main__":